@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
-import json
+import binascii
+
+import orjson
 
 from ...intunecdlib.BaseBackupModule import BaseBackupModule
 
@@ -54,38 +56,46 @@ class AppConfigurationBackupModule(BaseBackupModule):
                 for app in item["targetedMobileApps"]:
                     app_ids.add(app)
             
-            # Batch fetch all app details at once
+            # Fetch all app details with one $filter query per 15 ids on the
+            # collection endpoint instead of one $batch sub-request per app
             app_details_map = {}
             if app_ids:
-                app_list = [{"id": app_id} for app_id in app_ids]
-                app_responses = self.batch_request(
-                    data=app_list,
-                    url="/beta/deviceAppManagement/mobileApps",
-                    extra_url="",
-                    method="GET"
-                )
-                # Build a map of app_id -> app_data for quick lookup
-                for response in app_responses:
-                    if response.get("body"):
-                        app_data = response["body"]
-                        app_details_map[app_data["id"]] = app_data
+                app_id_list = list(app_ids)
+                for i in range(0, len(app_id_list), 15):
+                    chunk = app_id_list[i : i + 15]
+                    app_data = self.make_graph_request(
+                        endpoint=self.endpoint + self.APP_ENDPOINT,
+                        params={
+                            "$filter": " or ".join(f"id eq '{app_id}'" for app_id in chunk),
+                            "$select": "id,displayName",
+                        },
+                    )
+                    # Build a map of app_id -> app_data for quick lookup
+                    for app in app_data.get("value", []):
+                        app_details_map[app["id"]] = app
             
             # Now process each configuration with the pre-fetched app details
             for item in self.graph_data["value"]:
                 if item.get("targetedMobileApps"):
-                    # Get the first app (assuming single app per config based on original logic)
-                    for app in item["targetedMobileApps"]:
-                        app_data = app_details_map.get(app)
-                        if app_data:
-                            item.pop("targetedMobileApps")
-                            item["targetedMobileApps"] = {}
-                            item["targetedMobileApps"]["appName"] = app_data["displayName"]
-                            item["targetedMobileApps"]["type"] = app_data["@odata.type"]
-                            break  # Only process first app as per original logic
+                    # Only the first targeted app is kept, as before; assign
+                    # the replacement dict in one go instead of pop + rebuild
+                    app = next(iter(item["targetedMobileApps"]), None)
+                    app_data = app_details_map.get(app)
+                    if app_data:
+                        item["targetedMobileApps"] = {
+                            "appName": app_data["displayName"],
+                            "type": app_data["@odata.type"],
+                        }
                 
                 if item.get("payloadJson"):
-                    item["payloadJson"] = self.decode_base64(item["payloadJson"])
-                    item["payloadJson"] = json.loads(item["payloadJson"])
+                    # Decode base64 straight to bytes and parse with orjson,
+                    # both C paths, skipping the intermediate str round trip
+                    try:
+                        item["payloadJson"] = orjson.loads(
+                            binascii.a2b_base64(item["payloadJson"])
+                        )
+                    except ValueError:
+                        item["payloadJson"] = self.decode_base64(item["payloadJson"])
 
         try:
             self.results = self.process_data(
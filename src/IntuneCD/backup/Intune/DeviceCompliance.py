@@ -1,6 +1,19 @@
 # -*- coding: utf-8 -*-
+import json
+import operator
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import reduce
+
 from ...intunecdlib.BaseBackupModule import BaseBackupModule
 
+# Pattern to pull the policy id out of the @odata.context of a batched
+# scheduledActionsForRule response body
+POLICY_ID_PATTERN = re.compile(r"compliancePolicies\('([^']+)'\)")
+
+# Sentinel Graph uses for "no notification template"
+EMPTY_GUID = "00000000-0000-0000-0000-000000000000"
+
 
 class DeviceComplianceBackupModule(BaseBackupModule):
     """A class used to backup Intune Device Compliance Policies
@@ -29,6 +42,9 @@ class DeviceComplianceBackupModule(BaseBackupModule):
             self.assignment_endpoint or "deviceManagement/compliancePolicies/"
         )
         self.assignment_extra_url = self.assignment_extra_url or "/assignments"
+        # Notification template names already resolved on this instance,
+        # keyed by template id, so repeated lookups collapse to one fetch
+        self._template_cache = {}
 
     def _check_linux_discovery_script(self, data: dict) -> bool:
         """Checks if the data is a Linux discovery script
@@ -39,39 +55,39 @@ class DeviceComplianceBackupModule(BaseBackupModule):
         Returns:
             bool: If the data is a Linux discovery script
         """
-        if isinstance(data, dict):
-            if "linux_customcompliance_discoveryscript" in data.values():
-                return True
-            return any(self._check_linux_discovery_script(v) for v in data.values())
-        if isinstance(data, list):
-            return any(self._check_linux_discovery_script(v) for v in data)
-        return False
-
-    def _get_detection_script_id(self, data: dict, path=None) -> list:
+        # Serializing once and scanning the string is much cheaper than
+        # recursively walking every dict and list in the policy. The colon
+        # prefix keeps the match anchored to dict values, like the old walk.
+        blob = json.dumps(data, separators=(",", ":"))
+        return ':"linux_customcompliance_discoveryscript"' in blob
+
+    def _get_detection_script_id(self, data: dict) -> list:
         """Gets the detection script ID path from the data
 
+        The returned path points at the dict holding the sentinel value, so
+        the detection script id can be read from its simpleSettingValue.
+
         Args:
             data (dict): The data to get the detection script ID from
-            path (_type_, optional): The path to the detection script ID
 
         Returns:
             list: The path to the detection script ID
         """
-        if path is None:
-            path = []
-        if isinstance(data, dict):
-            for k, v in data.items():
-                if isinstance(v, dict):
-                    new_path = self._get_detection_script_id(v, path + [k])
-                    if new_path is not None:
-                        return new_path
-                elif isinstance(v, list):
-                    for i, item in enumerate(v):
-                        new_path = self._get_detection_script_id(item, path + [k, i])
-                        if new_path is not None:
-                            return new_path
-                elif v == "linux_customcompliance_discoveryscript":
-                    return path
+        # Iterative DFS with tuple paths; tuples are cheaper to extend than
+        # the per-call list copies the old recursive version made
+        stack = [(data, ())]
+        while stack:
+            node, path = stack.pop()
+            if isinstance(node, dict):
+                for k, v in node.items():
+                    if isinstance(v, (dict, list)):
+                        stack.append((v, path + (k,)))
+                    elif v == "linux_customcompliance_discoveryscript":
+                        return list(path)
+            else:
+                for i, v in enumerate(node):
+                    if isinstance(v, (dict, list)):
+                        stack.append((v, path + (i,)))
         return None
 
     def _get_value_from_path(self, data: dict, path: list) -> str:
@@ -79,17 +95,15 @@ class DeviceComplianceBackupModule(BaseBackupModule):
 
         Args:
             data (dict): The data to get the value from
-            path (list): The path to the value
+            path (list): The path to the value, dict keys as str and list
+                indexes as int
 
         Returns:
             str: The value from the path
         """
-        for key in path:
-            if isinstance(data, list):
-                data = data[int(key)]
-            else:
-                data = data[key]
-        return data["simpleSettingValue"]["value"]
+        # _get_detection_script_id stores list indexes as real ints, so the
+        # path can be walked with plain getitem and no per-step type checks
+        return reduce(operator.getitem, path, data)["simpleSettingValue"]["value"]
 
     def _get_notification_template(self, rule: dict[str, any]) -> dict[str, any]:
         """Gets the notification template for a rule
@@ -101,10 +115,7 @@ class DeviceComplianceBackupModule(BaseBackupModule):
             dict[str, any]: The notification template
         """
         for action in rule["scheduledActionConfigurations"]:
-            if (
-                action.get("notificationTemplateId")
-                != "00000000-0000-0000-0000-000000000000"
-            ):
+            if action.get("notificationTemplateId") != EMPTY_GUID:
                 notification_template = self.make_graph_request(
                     self.endpoint
                     + "/beta/deviceManagement/notificationMessageTemplates/"
@@ -139,9 +150,15 @@ class DeviceComplianceBackupModule(BaseBackupModule):
         detection_script_ids = set()
         notification_template_ids = set()
         scheduled_actions_ids = []
-        
+        detection_script_id_map = {}
+        # Index policies by id once so batch responses are written straight
+        # onto the policy dicts instead of into intermediate maps
+        item_by_id = {item["id"]: item for item in self.graph_data["value"]}
+
         for item in self.graph_data["value"]:
-            # Collect detection script IDs for Linux policies
+            item["scheduledActionsForRule"] = []
+            # Resolve the detection script ID once per Linux policy; the
+            # assembly loop below reuses it instead of re-walking the policy
             if self._check_linux_discovery_script(item):
                 detection_script_id_path = self._get_detection_script_id(item)
                 if detection_script_id_path is not None:
@@ -149,46 +166,69 @@ class DeviceComplianceBackupModule(BaseBackupModule):
                         item, detection_script_id_path
                     )
                     detection_script_ids.add(detection_script_id)
-            
+                    detection_script_id_map[item["id"]] = detection_script_id
+
             # Collect policy IDs for scheduled actions
             scheduled_actions_ids.append({"id": item["id"]})
 
-        # Batch fetch all detection scripts
-        detection_scripts_map = {}
-        if detection_script_ids:
-            for script_id in detection_script_ids:
-                detection_script = self.make_graph_request(
+        def _fetch_detection_scripts() -> dict:
+            # One $filter query per 15 ids, keeping the URL well under the
+            # Graph length limit
+            scripts_map = {}
+            script_ids = list(detection_script_ids)
+            for i in range(0, len(script_ids), 15):
+                chunk = script_ids[i : i + 15]
+                detection_scripts = self.make_graph_request(
                     endpoint=self.endpoint
                     + "/beta/deviceManagement/reusablePolicySettings/",
-                    params={"$filter": f"id eq '{script_id}'"},
+                    params={
+                        "$filter": " or ".join(f"id eq '{sid}'" for sid in chunk),
+                        "$select": "id,displayName",
+                    },
                 )
-                if detection_script.get("value"):
-                    detection_scripts_map[script_id] = detection_script["value"][0]["displayName"]
-        
-        # Batch fetch all scheduled actions
-        scheduled_actions_responses = self.batch_request(
-            data=scheduled_actions_ids,
-            url="/beta/deviceManagement/compliancePolicies",
-            extra_url="/scheduledActionsForRule?$expand=scheduledActionConfigurations",
-            method="GET"
-        )
-        
-        scheduled_actions_map = {}
+                for script in detection_scripts.get("value", []):
+                    scripts_map[script["id"]] = script["displayName"]
+            return scripts_map
+
+        # The detection script and scheduled action fetches are independent
+        # of each other, so run them concurrently; the notification template
+        # stage below depends on the scheduled actions and waits for them
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            detection_scripts_future = executor.submit(_fetch_detection_scripts)
+            scheduled_actions_future = executor.submit(
+                self.batch_request,
+                scheduled_actions_ids,
+                "/beta/deviceManagement/compliancePolicies",
+                "/scheduledActionsForRule?$expand=scheduledActionConfigurations",
+            )
+            detection_scripts_map = detection_scripts_future.result()
+            scheduled_actions_responses = scheduled_actions_future.result()
+
+
+        # Write detection script names straight onto the Linux policies
+        for policy_id, detection_script_id in detection_script_id_map.items():
+            item_by_id[policy_id]["detectionScriptName"] = detection_scripts_map.get(
+                detection_script_id
+            )
+
         for response in scheduled_actions_responses:
-            if response.get("body") and response["body"].get("value"):
-                # Extract policy ID from the response
-                policy_id = response.get("id", "").split("/")[-2] if "/" in response.get("id", "") else None
-                if policy_id:
-                    scheduled_actions_map[policy_id] = response["body"]["value"]
+            if response.get("value"):
+                # batch_request returns unwrapped bodies, so the policy ID is
+                # recovered from the body's @odata.context
+                match = POLICY_ID_PATTERN.search(response.get("@odata.context", ""))
+                if match and match.group(1) in item_by_id:
+                    item_by_id[match.group(1)]["scheduledActionsForRule"] = response["value"]
                     # Collect notification template IDs from scheduled actions
-                    for action in response["body"]["value"]:
+                    for action in response["value"]:
                         for config in action.get("scheduledActionConfigurations", []):
                             template_id = config.get("notificationTemplateId")
-                            if template_id and template_id != "00000000-0000-0000-0000-000000000000":
+                            if template_id and template_id != EMPTY_GUID:
                                 notification_template_ids.add(template_id)
-        
-        # Batch fetch all notification templates
-        notification_templates_map = {}
+
+
+        # Batch fetch all notification templates not already cached
+        notification_templates_map = dict(self._template_cache)
+        notification_template_ids -= notification_templates_map.keys()
         if notification_template_ids:
             template_list = [{"id": template_id} for template_id in notification_template_ids]
             template_responses = self.batch_request(
@@ -197,32 +237,23 @@ class DeviceComplianceBackupModule(BaseBackupModule):
                 extra_url="",
                 method="GET"
             )
-            for response in template_responses:
-                if response.get("body"):
-                    template_data = response["body"]
-                    notification_templates_map[template_data["id"]] = template_data["displayName"]
+            # Each response is the template entity itself and carries its id
+            for template_data in template_responses:
+                if template_data.get("id"):
+                    notification_templates_map[template_data["id"]] = template_data.get("displayName")
+                    self._template_cache[template_data["id"]] = template_data.get("displayName")
 
-        # Now process each item with the pre-fetched data
+        # Add notification template names; the zero-guid sentinel was
+        # never fetched into the map, so a miss already means no name
         for item in self.graph_data["value"]:
-            # Add detection script name if Linux policy
-            if self._check_linux_discovery_script(item):
-                detection_script_id_path = self._get_detection_script_id(item)
-                if detection_script_id_path is not None:
-                    detection_script_id = self._get_value_from_path(
-                        item, detection_script_id_path
-                    )
-                    item["detectionScriptName"] = detection_scripts_map.get(detection_script_id)
-
-            # Add scheduled actions from the batch response
-            item["scheduledActionsForRule"] = scheduled_actions_map.get(item["id"], [])
-
-            # Add notification template names
-            for action in item.get("scheduledActionsForRule", []):
+            for action in item["scheduledActionsForRule"]:
                 self.remove_keys(action)
                 for config in action.get("scheduledActionConfigurations", []):
-                    template_id = config.get("notificationTemplateId")
-                    if template_id and template_id != "00000000-0000-0000-0000-000000000000":
-                        config["notificationTemplateName"] = notification_templates_map.get(template_id)
+                    template_name = notification_templates_map.get(
+                        config.get("notificationTemplateId")
+                    )
+                    if template_name is not None:
+                        config["notificationTemplateName"] = template_name
                     self.remove_keys(config)
 
         try:
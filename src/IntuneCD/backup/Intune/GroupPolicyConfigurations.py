@@ -1,6 +1,16 @@
 # -*- coding: utf-8 -*-
+import re
+from concurrent.futures import ThreadPoolExecutor
+
 from ...intunecdlib.BaseBackupModule import BaseBackupModule
 
+# Patterns to pull the policy and definition value ids out of the
+# @odata.context of a batched response body
+POLICY_ID_PATTERN = re.compile(r"groupPolicyConfigurations\('([^']+)'\)")
+DEFINITION_ID_PATTERN = re.compile(
+    r"groupPolicyConfigurations\('([^']+)'\)/definitionValues\('([^']+)'\)"
+)
+
 
 class GroupPolicyConfigurationsBackupModule(BaseBackupModule):
     """A class used to backup Intune Group Policy Configurations
@@ -26,6 +36,68 @@ class GroupPolicyConfigurationsBackupModule(BaseBackupModule):
         self.assignment_endpoint = "deviceManagement/groupPolicyConfigurations/"
         self.assignment_extra_url = "/assignments"
 
+    def _fetch_chunk(self, policy_ids: list) -> tuple:
+        """Fetches definition and presentation values for a chunk of policies
+
+        The presentation batch for the chunk is dispatched as soon as the
+        chunk's definition responses are in, so chunks pipeline instead of
+        waiting on a full barrier between the two stages.
+
+        Args:
+            policy_ids (list): The policy IDs in the chunk
+
+        Returns:
+            tuple: Maps of policy ID to definitions and of
+                policy ID/definition ID to presentations
+        """
+        definitions_map = {}
+        definition_responses = self.batch_request(
+            data=[{"id": policy_id} for policy_id in policy_ids],
+            url="/beta/deviceManagement/groupPolicyConfigurations",
+            extra_url="/definitionValues?$expand=definition",
+            method="GET",
+        )
+        for response in definition_responses:
+            if response.get("value"):
+                match = POLICY_ID_PATTERN.search(response.get("@odata.context", ""))
+                if match:
+                    definitions_map[match.group(1)] = response["value"]
+
+        # Chunks full of empty placeholder policies are common; skip the
+        # presentation round trip outright when nothing was configured
+        if not definitions_map:
+            self.log(
+                function="_fetch_chunk",
+                msg=f"No definition values for {len(policy_ids)} policies, skipping presentation values",
+            )
+            return definitions_map, {}
+
+        presentation_requests = []
+        for policy_id, definitions in definitions_map.items():
+            for definition in definitions:
+                presentation_requests.append(
+                    {"id": f"{policy_id}/definitionValues/{definition['id']}"}
+                )
+
+        presentations_map = {}
+        if presentation_requests:
+            presentation_responses = self.batch_request(
+                data=presentation_requests,
+                url="/beta/deviceManagement/groupPolicyConfigurations",
+                extra_url="/presentationValues?$expand=presentation",
+                method="GET",
+            )
+            for response in presentation_responses:
+                if response.get("value"):
+                    match = DEFINITION_ID_PATTERN.search(
+                        response.get("@odata.context", "")
+                    )
+                    if match:
+                        key = f"{match.group(1)}/definitionValues/{match.group(2)}"
+                        presentations_map[key] = response["value"]
+
+        return definitions_map, presentations_map
+
     def main(self) -> dict[str, any]:
         """The main method to backup the Group Policy Configurations
 
@@ -43,72 +115,35 @@ class GroupPolicyConfigurationsBackupModule(BaseBackupModule):
             )
             return None
 
-        # Stage 1: Batch fetch all definition values for all policies
-        definition_requests = []
+        # Fetch definition and presentation values per chunk of 20 policies;
+        # each chunk's presentation batch dispatches as soon as that chunk's
+        # definitions are in, instead of after a barrier between the stages.
+        # Results are written straight onto the policy dicts as each chunk
+        # completes, so no separate assembly pass is needed
+        item_by_id = {item["id"]: item for item in self.graph_data["value"]}
         for item in self.graph_data["value"]:
-            definition_requests.append({"id": item["id"]})
-        
-        definitions_map = {}
-        if definition_requests:
-            definition_responses = self.batch_request(
-                data=definition_requests,
-                url="/beta/deviceManagement/groupPolicyConfigurations",
-                extra_url="/definitionValues?$expand=definition",
-                method="GET"
-            )
-            
-            # Build map of policy_id -> definitions
-            for response in definition_responses:
-                if response.get("body") and response["body"].get("value"):
-                    # Extract policy ID from response
-                    policy_id = response.get("id", "").split("/")[-2] if "/" in response.get("id", "") else None
-                    if policy_id:
-                        definitions_map[policy_id] = response["body"]["value"]
-
-        # Stage 2: Collect all presentation requests and batch fetch them
-        presentation_requests = []
-        policy_definition_map = {}  # Map to track which presentation belongs to which policy/definition
-        
-        for item in self.graph_data["value"]:
-            policy_id = item["id"]
-            definitions = definitions_map.get(policy_id, [])
-            
-            for definition in definitions:
-                presentation_requests.append({
-                    "id": f"{policy_id}/definitionValues/{definition['id']}"
-                })
-                # Store mapping for later reconstruction
-                key = f"{policy_id}/definitionValues/{definition['id']}"
-                policy_definition_map[key] = (policy_id, definition["id"])
-        
-        presentations_map = {}
-        if presentation_requests:
-            presentation_responses = self.batch_request(
-                data=presentation_requests,
-                url="/beta/deviceManagement/groupPolicyConfigurations",
-                extra_url="/presentationValues?$expand=presentation",
-                method="GET"
-            )
-            
-            # Build map of policy_id/definition_id -> presentations
-            for response in presentation_responses:
-                if response.get("body") and response["body"].get("value"):
-                    # Extract the composite key from response ID
-                    response_id = response.get("id", "")
-                    # Parse the ID to get policy and definition IDs
-                    if "/presentationValues" in response_id:
-                        key = response_id.split("/presentationValues")[0]
-                        presentations_map[key] = response["body"]["value"]
-
-        # Stage 3: Assemble the data structure
-        for item in self.graph_data["value"]:
-            policy_id = item["id"]
-            definitions = definitions_map.get(policy_id, [])
-            item["definitionValues"] = definitions
-            
-            for definition in item["definitionValues"]:
-                key = f"{policy_id}/definitionValues/{definition['id']}"
-                definition["presentationValues"] = presentations_map.get(key, [])
+            item["definitionValues"] = []
+
+        policy_ids = list(item_by_id)
+        if policy_ids:
+            chunks = [
+                policy_ids[i : i + self.GRAPH_BATCH_SIZE]
+                for i in range(0, len(policy_ids), self.GRAPH_BATCH_SIZE)
+            ]
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                for chunk_definitions, chunk_presentations in executor.map(
+                    self._fetch_chunk, chunks
+                ):
+                    for policy_id, definitions in chunk_definitions.items():
+                        item = item_by_id.get(policy_id)
+                        if item is None:
+                            continue
+                        for definition in definitions:
+                            key = f"{policy_id}/definitionValues/{definition['id']}"
+                            definition["presentationValues"] = chunk_presentations.get(
+                                key, []
+                            )
+                        item["definitionValues"] = definitions
 
         try:
             self.results = self.process_data(
@@ -1,6 +1,16 @@
 # -*- coding: utf-8 -*-
+import os
+import re
+import time
+
+import orjson
+
 from ...intunecdlib.BaseBackupModule import BaseBackupModule
 
+# Pattern to pull the role id out of the @odata.context of a batched
+# roleAssignments response body
+ROLE_ID_PATTERN = re.compile(r"roleDefinitions\('([^']+)'\)")
+
 
 class RolesBackupModule(BaseBackupModule):
     """A class used to backup Intune Roles
@@ -8,10 +18,14 @@ class RolesBackupModule(BaseBackupModule):
     Attributes:
         CONFIG_ENDPOINT (str): The endpoint to get the data from
         LOG_MESSAGE (str): The message to log when backing up the data
+        GROUP_NAME_CACHE_FILE (str): The file the group name cache is saved to
+        GROUP_NAME_CACHE_TTL (int): How long cached group names stay valid
     """
 
     CONFIG_ENDPOINT = "/beta/deviceManagement/roleDefinitions"
     LOG_MESSAGE = "Backing up Role: "
+    GROUP_NAME_CACHE_FILE = ".group_name_cache.json"
+    GROUP_NAME_CACHE_TTL = 7 * 24 * 60 * 60
 
     def __init__(self, *args, **kwargs):
         """Initializes the RolesBackupModule class
@@ -23,6 +37,48 @@ class RolesBackupModule(BaseBackupModule):
         super().__init__(*args, **kwargs)
         self.path = f"{self.path}/Roles/"
         self.audit_filter = "componentName eq 'RoleBasedAccessControl'"
+        # Group names already resolved on this instance, keyed by group id,
+        # so assignments sharing a group do not re-fetch it
+        self._group_cache = {}
+        # Timestamps for entries loaded from or saved to the on-disk cache
+        self._group_cache_ts = {}
+        self._group_cache_path = os.path.join(
+            os.path.dirname(self.path.rstrip("/")), self.GROUP_NAME_CACHE_FILE
+        )
+
+    def _load_group_name_cache(self) -> None:
+        """Loads group names cached by earlier backup runs
+
+        Entries older than GROUP_NAME_CACHE_TTL are treated as stale and
+        dropped so renamed groups are picked up again.
+        """
+        try:
+            with open(self._group_cache_path, "rb") as cache_file:
+                cached = orjson.loads(cache_file.read())
+        except (OSError, ValueError):
+            return
+
+        cutoff = time.time() - self.GROUP_NAME_CACHE_TTL
+        for group_id, entry in cached.items():
+            if entry.get("ts", 0) >= cutoff:
+                self._group_cache[group_id] = entry["name"]
+                self._group_cache_ts[group_id] = entry["ts"]
+
+    def _save_group_name_cache(self) -> None:
+        """Persists the resolved group names for the next backup run"""
+        now = time.time()
+        cache_data = {
+            group_id: {"name": name, "ts": self._group_cache_ts.get(group_id, now)}
+            for group_id, name in self._group_cache.items()
+        }
+        try:
+            with open(self._group_cache_path, "wb") as cache_file:
+                cache_file.write(orjson.dumps(cache_data))
+        except OSError as e:
+            self.log(
+                tag="warning",
+                msg=f"Could not save group name cache to {self._group_cache_path}: {e}",
+            )
 
     def _get_group_names(self, item) -> list:
         """Gets the group names from the group ids
@@ -73,6 +129,10 @@ class RolesBackupModule(BaseBackupModule):
             return None
 
         if "assignments" not in self.exclude:
+            # Index roles by id once so the resolved assignments are written
+            # straight onto the role dicts
+            item_by_id = {item["id"]: item for item in self.graph_data["value"]}
+
             # Stage 1: Batch fetch all role assignments
             role_ids = [{"id": item["id"]} for item in self.graph_data["value"]]
             
@@ -85,23 +145,24 @@ class RolesBackupModule(BaseBackupModule):
                     method="GET"
                 )
                 
-                # Build map of role_id -> assignments
+                # Build map of role_id -> assignments; batch_request returns
+                # unwrapped bodies, so the role ID comes from @odata.context
                 for response in assignment_responses:
-                    if response.get("body") and response["body"].get("value"):
-                        role_id = response.get("id", "").split("/")[-2] if "/" in response.get("id", "") else None
-                        if role_id:
-                            assignments_map[role_id] = response["body"]["value"]
+                    if response.get("value"):
+                        match = ROLE_ID_PATTERN.search(
+                            response.get("@odata.context", "")
+                        )
+                        if match:
+                            assignments_map[match.group(1)] = response["value"]
             
             # Stage 2: Collect all assignment IDs and batch fetch their details
-            assignment_ids = []
-            role_assignment_mapping = {}  # Map assignment_id -> role_id
-            
-            for item in self.graph_data["value"]:
-                assignments = assignments_map.get(item["id"], [])
-                for assignment in assignments:
-                    assignment_ids.append({"id": assignment["id"]})
-                    role_assignment_mapping[assignment["id"]] = item["id"]
-            
+            assignment_ids = [
+                {"id": assignment["id"]}
+                for assignments in assignments_map.values()
+                for assignment in assignments
+            ]
+
+
             assignment_details_map = {}
             if assignment_ids:
                 assignment_detail_responses = self.batch_request(
@@ -111,9 +172,9 @@ class RolesBackupModule(BaseBackupModule):
                     method="GET"
                 )
                 
-                for response in assignment_detail_responses:
-                    if response.get("body"):
-                        assignment_data = response["body"]
+                # Each response is the assignment entity itself
+                for assignment_data in assignment_detail_responses:
+                    if assignment_data.get("id"):
                         assignment_details_map[assignment_data["id"]] = assignment_data
             
             # Stage 3: Collect all group IDs (scopeMembers and members)
@@ -124,50 +185,60 @@ class RolesBackupModule(BaseBackupModule):
                 if assignment_data.get("members"):
                     group_ids.update(assignment_data["members"])
             
-            # Stage 4: Batch fetch all group names
-            group_names_map = {}
+            # Stage 4: Batch fetch all group names not already cached, either
+            # on this instance or on disk from an earlier backup run
+            self._load_group_name_cache()
+            group_names_map = dict(self._group_cache)
+            group_ids -= group_names_map.keys()
             if group_ids:
                 group_list = [{"id": group_id} for group_id in group_ids]
                 group_responses = self.batch_request(
                     data=group_list,
                     url="/beta/groups",
-                    extra_url="?$select=displayName",
+                    extra_url="?$select=id,displayName",
                     method="GET"
                 )
-                
-                for response in group_responses:
-                    if response.get("body"):
-                        group_data = response["body"]
-                        group_names_map[group_data["id"]] = group_data["displayName"]
+
+                # Each response is the group entity itself; id is selected so
+                # the body carries its own key
+                for group_data in group_responses:
+                    if group_data.get("id"):
+                        group_names_map[group_data["id"]] = group_data.get("displayName")
+                        self._group_cache[group_data["id"]] = group_data.get("displayName")
+
+                self._save_group_name_cache()
             
-            # Stage 5: Assemble the data
-            for item in self.graph_data["value"]:
-                assignments = assignments_map.get(item["id"], [])
-                
-                if assignments:
-                    item["roleAssignments"] = []
-                    for assignment in assignments:
-                        assignment_detail = assignment_details_map.get(assignment["id"])
-                        if assignment_detail:
-                            self.remove_keys(assignment_detail)
-                            
-                            # Replace group IDs with names
-                            if assignment_detail.get("scopeMembers"):
-                                assignment_detail["scopeMembers"] = [
-                                    group_names_map.get(group_id, group_id)
-                                    for group_id in assignment_detail["scopeMembers"]
-                                ]
-                            
-                            if assignment_detail.get("members"):
-                                assignment_detail["members"] = [
-                                    group_names_map.get(group_id, group_id)
-                                    for group_id in assignment_detail["members"]
-                                ]
-                            
-                            # Remove resourceScopes
-                            assignment_detail.pop("resourceScopes", None)
-                            
-                            item["roleAssignments"].append(assignment_detail)
+            # Stage 5: Assemble straight onto the role dicts; only roles with
+            # assignments appear in the map, matching the old behaviour of
+            # leaving roleAssignments unset otherwise
+            for role_id, assignments in assignments_map.items():
+                item = item_by_id.get(role_id)
+                if item is None:
+                    continue
+
+                item["roleAssignments"] = []
+                for assignment in assignments:
+                    assignment_detail = assignment_details_map.get(assignment["id"])
+                    if assignment_detail:
+                        self.remove_keys(assignment_detail)
+
+                        # Replace group IDs with names
+                        if assignment_detail.get("scopeMembers"):
+                            assignment_detail["scopeMembers"] = [
+                                group_names_map.get(group_id, group_id)
+                                for group_id in assignment_detail["scopeMembers"]
+                            ]
+
+                        if assignment_detail.get("members"):
+                            assignment_detail["members"] = [
+                                group_names_map.get(group_id, group_id)
+                                for group_id in assignment_detail["members"]
+                            ]
+
+                        # Remove resourceScopes
+                        assignment_detail.pop("resourceScopes", None)
+
+                        item["roleAssignments"].append(assignment_detail)
 
         # Clean up role data
         for item in self.graph_data["value"]:
@@ -7,6 +7,7 @@ import uuid
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from uuid import uuid4
 
+import orjson
 import requests
 from deepdiff import DeepDiff
 
@@ -16,6 +17,9 @@ from .IntuneCDBase import IntuneCDBase
 class BaseGraphModule(IntuneCDBase):
     """Base class for the Graph API, used to make requests to the Microsoft Graph API."""
 
+    # Microsoft Graph $batch accepts at most 20 sub-requests per call
+    GRAPH_BATCH_SIZE = 20
+
     def __init__(self, *args, **kwargs):
         """Initialize the BaseGraphModule with a connection-pooled session."""
         super().__init__(*args, **kwargs)
@@ -130,9 +134,10 @@ class BaseGraphModule(IntuneCDBase):
                 f"Request failed after {max_retries} retries with {response.status_code if response else 'no response'} - {response.text if response else 'no response'}"
             )
 
-        # Handle JSON response
-        if method == "GET" and response.text:
-            json_data = json.loads(response.text)
+        # Handle JSON response, orjson parses the raw bytes directly without
+        # the intermediate str that stdlib json would decode first
+        if method == "GET" and response.content:
+            json_data = orjson.loads(response.content)
             if "@odata.nextLink" in json_data:
                 record = self.make_graph_request(
                     method=method, endpoint=json_data["@odata.nextLink"]
@@ -140,7 +145,7 @@ class BaseGraphModule(IntuneCDBase):
                 json_data["value"].extend(record["value"])
             return json_data
 
-        return json.loads(response.text) if response.text else {}
+        return orjson.loads(response.content) if response.content else {}
 
     def make_audit_request(self, audit_filter: str):
         """
@@ -224,6 +229,10 @@ class BaseGraphModule(IntuneCDBase):
         Returns:
             tuple: Tuple containing the query data and the batch ID
         """
+        if len(batch) > self.GRAPH_BATCH_SIZE:
+            raise ValueError(
+                f"Batch of {len(batch)} requests exceeds the Graph $batch limit of {self.GRAPH_BATCH_SIZE}"
+            )
         query_data = {"requests": []}
         for b_id in batch:
             # Extract the id from the dict if it's a dict, otherwise use it directly
@@ -425,7 +434,7 @@ class BaseGraphModule(IntuneCDBase):
         """
         responses = []
         batch_id = 1
-        batch_count = 20
+        batch_count = self.GRAPH_BATCH_SIZE
         retry_pool = []
         wait_time = 0
         initial_request_data = []
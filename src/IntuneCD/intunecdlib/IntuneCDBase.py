@@ -5,20 +5,19 @@ import os
 import sys
 import time
 
+import orjson
 import yaml
 
+# Use the libyaml dumper when it is available, it is much faster
+YAML_DUMPER = getattr(yaml, "CDumper", yaml.Dumper)
+
 
 class IntuneCDBase:
     """IntuneCDBase is the base class for the IntuneCD library."""
 
-    def remove_keys(self, data: dict):
-        """
-        This function removes keys from the data.
-        :param data: The data to remove keys from.
-        :return: The data with removed keys.
-        """
-
-        keys = {
+    # Keys stripped from backed up data, built once instead of per call
+    REMOVE_KEYS = frozenset(
+        {
             "id",
             "version",
             "topicIdentifier",
@@ -44,16 +43,28 @@ class IntuneCDBase:
             "intunecd_name",
             "deviceHealthScriptType",
         }
+    )
+
+    def remove_keys(self, data: dict):
+        """
+        This function removes keys from the data.
+        :param data: The data to remove keys from.
+        :return: The data with removed keys.
+        """
+
+        keys = self.REMOVE_KEYS
 
         if "VPPusedLicenseCount" in self.exclude:
-            keys.add("usedLicenseCount")
+            keys |= {"usedLicenseCount"}
         if "GPlaySyncTime" in self.exclude:
-            keys.add("lastAppSyncDateTime")
+            keys |= {"lastAppSyncDateTime"}
         if "CompliancePartnerHeartbeat" in self.exclude:
-            keys.add("lastHeartbeatDateTime")
+            keys |= {"lastHeartbeatDateTime"}
 
-        for k in keys:
-            data.pop(k, None)
+        # Only touch the keys actually present instead of popping the whole
+        # blocklist against every dict
+        for k in keys.intersection(data):
+            del data[k]
 
         return data
 
@@ -67,10 +78,26 @@ class IntuneCDBase:
 
         if filetype == "yaml":
             with open(path + filename + ".yaml", "w", encoding="utf-8") as yamlFile:
-                yaml.dump(data, yamlFile, sort_keys=False, default_flow_style=False)
+                yaml.dump(
+                    data,
+                    yamlFile,
+                    sort_keys=False,
+                    default_flow_style=False,
+                    Dumper=YAML_DUMPER,
+                )
         elif filetype == "json":
-            with open(path + filename + ".json", "w", encoding="utf-8") as jsonFile:
-                json.dump(data, jsonFile, indent=5)
+            # Serialize straight to bytes with orjson and swap the file into
+            # place atomically so an interrupted run cannot leave a
+            # half-written backup behind
+            tmp_path = path + filename + ".json.tmp"
+            with open(tmp_path, "wb") as jsonFile:
+                jsonFile.write(
+                    orjson.dumps(
+                        data,
+                        option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE,
+                    )
+                )
+            os.replace(tmp_path, path + filename + ".json")
 
         else:
             raise ValueError("Invalid output format")
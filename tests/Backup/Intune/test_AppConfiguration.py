@@ -16,8 +16,12 @@ class TestAppConfigurationBackupModule(unittest.TestCase):
     def test_main(self, mock_process_data, mock_make_graph_request):
         """Test that main calls make_graph_request and process_data."""
         mock_make_graph_request.side_effect = [
-            {"value": [{"id": "object", "targetedMobileApps": {"id": "app1"}}]},
-            {"id": "app1", "displayName": "app1", "@odata.type": "magic.app"},
+            {"value": [{"id": "object", "targetedMobileApps": ["app1"]}]},
+            {
+                "value": [
+                    {"id": "app1", "displayName": "app1", "@odata.type": "magic.app"}
+                ]
+            },
         ]
 
         self.module.main()
@@ -25,7 +29,10 @@ class TestAppConfigurationBackupModule(unittest.TestCase):
         mock_make_graph_request.assert_has_calls(
             [
                 call(endpoint=self.module.endpoint + self.module.CONFIG_ENDPOINT),
-                call(endpoint=self.module.endpoint + self.module.APP_ENDPOINT + "/id"),
+                call(
+                    endpoint=self.module.endpoint + self.module.APP_ENDPOINT,
+                    params={"$filter": "id eq 'app1'", "$select": "id,displayName"},
+                ),
             ]
         )
 
@@ -64,8 +71,12 @@ class TestAppConfigurationBackupModule(unittest.TestCase):
     ):
         """Test that main logs an exception if process_data raises an exception."""
         mock_make_graph_request.side_effect = [
-            {"value": [{"id": "object", "targetedMobileApps": {"id": "app1"}}]},
-            {"id": "app1", "displayName": "app1", "@odata.type": "magic.app"},
+            {"value": [{"id": "object", "targetedMobileApps": ["app1"]}]},
+            {
+                "value": [
+                    {"id": "app1", "displayName": "app1", "@odata.type": "magic.app"}
+                ]
+            },
         ]
         mock_process_data.side_effect = Exception("Test exception")
 
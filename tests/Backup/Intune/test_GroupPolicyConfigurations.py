@@ -21,26 +21,45 @@ class TestGroupPolicyConfigurationsBackupModule(unittest.TestCase):
             }
         ]
 
+    @patch.object(GroupPolicyConfigurationsBackupModule, "batch_request")
     @patch.object(GroupPolicyConfigurationsBackupModule, "make_graph_request")
     @patch.object(GroupPolicyConfigurationsBackupModule, "process_data")
-    def test_main(self, mock_process_data, mock_make_graph_request):
+    def test_main(self, mock_process_data, mock_make_graph_request, mock_batch_request):
         """Test that main calls make_graph_request and process_data."""
-        mock_make_graph_request.side_effect = [
-            {"value": [{"id": "object"}]},
-            {"value": [{"id": "definition"}]},
-            {"value": [{"id": "presentation"}]},
+        mock_make_graph_request.return_value = {"value": [{"id": "object"}]}
+        mock_batch_request.side_effect = [
+            [
+                {
+                    "@odata.context": "https://graph.microsoft.com/beta/$metadata#deviceManagement/groupPolicyConfigurations('object')/definitionValues(definition())",
+                    "value": [{"id": "definition"}],
+                }
+            ],
+            [
+                {
+                    "@odata.context": "https://graph.microsoft.com/beta/$metadata#deviceManagement/groupPolicyConfigurations('object')/definitionValues('definition')/presentationValues(presentation())",
+                    "value": [{"id": "presentation"}],
+                }
+            ],
         ]
 
         self.module.main()
 
-        mock_make_graph_request.assert_has_calls(
+        mock_make_graph_request.assert_called_once_with(
+            endpoint=self.module.endpoint + self.module.CONFIG_ENDPOINT
+        )
+        mock_batch_request.assert_has_calls(
             [
-                call(endpoint=self.module.endpoint + self.module.CONFIG_ENDPOINT),
                 call(
-                    endpoint=f"{self.module.endpoint}{self.module.CONFIG_ENDPOINT}/object/definitionValues?$expand=definition"
+                    data=[{"id": "object"}],
+                    url="/beta/deviceManagement/groupPolicyConfigurations",
+                    extra_url="/definitionValues?$expand=definition",
+                    method="GET",
                 ),
                 call(
-                    endpoint=f"{self.module.endpoint}{self.module.CONFIG_ENDPOINT}/object/definitionValues/definition/presentationValues?$expand=presentation"
+                    data=[{"id": "object/definitionValues/definition"}],
+                    url="/beta/deviceManagement/groupPolicyConfigurations",
+                    extra_url="/presentationValues?$expand=presentation",
+                    method="GET",
                 ),
             ]
         )
@@ -69,18 +88,16 @@ class TestGroupPolicyConfigurationsBackupModule(unittest.TestCase):
             msg=f"Error getting Group Policy Configuration data from {self.module.endpoint + self.module.CONFIG_ENDPOINT}: Test exception",
         )
 
+    @patch.object(GroupPolicyConfigurationsBackupModule, "batch_request")
     @patch.object(GroupPolicyConfigurationsBackupModule, "process_data")
     @patch.object(GroupPolicyConfigurationsBackupModule, "make_graph_request")
     @patch.object(GroupPolicyConfigurationsBackupModule, "log")
     def test_main_logs_exception_process_data(
-        self, mock_log, mock_make_graph_request, mock_process_data
+        self, mock_log, mock_make_graph_request, mock_process_data, mock_batch_request
     ):
         """Test that main logs an exception if process_data raises an exception."""
-        mock_make_graph_request.side_effect = [
-            {"value": [{"id": "object"}]},
-            {"value": [{"id": "definition"}]},
-            {"value": [{"id": "presentation"}]},
-        ]
+        mock_make_graph_request.return_value = {"value": [{"id": "object"}]}
+        mock_batch_request.return_value = []
         mock_process_data.side_effect = Exception("Test exception")
 
         self.module.main()
@@ -12,37 +12,50 @@ class TestRolesBackupModule(unittest.TestCase):
         self.module = RolesBackupModule()
         self.module.exclude = []
 
+    @patch.object(RolesBackupModule, "batch_request")
     @patch.object(RolesBackupModule, "make_graph_request")
-    @patch.object(RolesBackupModule, "_get_group_names")
     @patch.object(RolesBackupModule, "process_data")
-    def test_main(
-        self, mock_process_data, mock_get_group_names, mock_make_graph_request
-    ):
+    def test_main(self, mock_process_data, mock_make_graph_request, mock_batch_request):
         """Test that main calls make_graph_request and process_data."""
-        mock_make_graph_request.side_effect = [
-            {"value": [{"id": "object", "rolePermissions": [{"actions": ["action"]}]}]},
-            {
-                "value": [
-                    {"id": "1"},
-                ]
-            },
-            {"scopeMembers": ["member"], "members": ["member"]},
+        mock_make_graph_request.return_value = {
+            "value": [{"id": "object", "rolePermissions": [{"actions": ["action"]}]}]
+        }
+        mock_batch_request.side_effect = [
+            [
+                {
+                    "@odata.context": "https://graph.microsoft.com/beta/$metadata#deviceManagement/roleDefinitions('object')/roleAssignments",
+                    "value": [{"id": "1"}],
+                }
+            ],
+            [{"id": "1", "scopeMembers": ["member"], "members": ["member"]}],
+            [{"id": "member", "displayName": "group name"}],
         ]
-        mock_get_group_names.side_effect = ["group name1", "group name2"]
 
         self.module.main()
 
-        mock_make_graph_request.assert_has_calls(
+        mock_make_graph_request.assert_called_once_with(
+            endpoint="https://graph.microsoft.com/beta/deviceManagement/roleDefinitions",
+            params={"$filter": "isBuiltIn eq false"},
+        )
+        mock_batch_request.assert_has_calls(
             [
                 call(
-                    endpoint="https://graph.microsoft.com/beta/deviceManagement/roleDefinitions",
-                    params={"$filter": "isBuiltIn eq false"},
+                    data=[{"id": "object"}],
+                    url="/beta/deviceManagement/roleDefinitions",
+                    extra_url="/roleAssignments",
+                    method="GET",
                 ),
                 call(
-                    "https://graph.microsoft.com/beta/deviceManagement/roleDefinitions/object/roleAssignments"
+                    data=[{"id": "1"}],
+                    url="/beta/deviceManagement/roleAssignments",
+                    extra_url="",
+                    method="GET",
                 ),
                 call(
-                    "https://graph.microsoft.com/beta/deviceManagement/roleAssignments/1"
+                    data=[{"id": "member"}],
+                    url="/beta/groups",
+                    extra_url="?$select=id,displayName",
+                    method="GET",
                 ),
             ]
         )
@@ -52,7 +65,7 @@ class TestRolesBackupModule(unittest.TestCase):
                     "id": "object",
                     "rolePermissions": [{}],
                     "roleAssignments": [
-                        {"scopeMembers": "group name1", "members": "group name2"}
+                        {"scopeMembers": ["group name"], "members": ["group name"]}
                     ],
                 }
             ],